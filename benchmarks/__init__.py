@@ -0,0 +1,9 @@
+"""Benchmarks and load tests for the car comparison app.
+
+Run ``python -m benchmarks --help`` for options. A typical run seeds a
+throwaway SQLite database, drives the main routes through the Flask test
+client and writes a JSON report that later runs can be compared against::
+
+    python -m benchmarks --cars-per-user 1000 --output bench.json
+    python -m benchmarks --cars-per-user 1000 --compare bench.json
+"""
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Seed synthetic cars, benchmark the app and write a JSON report.")
+    parser.add_argument('--database-url', help="Database to seed and benchmark (default: a temporary SQLite file). "
+                                               "Point this at a local PostgreSQL for production-like numbers.")
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--cars-per-user', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=50, help="Requests per read route and user.")
+    parser.add_argument('--login-requests', type=int, default=5)
+    parser.add_argument('--add-car-requests', type=int, default=10)
+    parser.add_argument('--scoring-sizes', default='10,100,1000,10000',
+                        help="Comma-separated car counts for the calculate_scores microbenchmark.")
+    parser.add_argument('--skip-routes', action='store_true')
+    parser.add_argument('--skip-scoring', action='store_true')
+    parser.add_argument('--startup', action='store_true',
+                        help="Also measure cold-start import time and first-request latency.")
+    parser.add_argument('--url', help="Benchmark a running server (e.g. gunicorn on http://127.0.0.1:8000) "
+                                      "that uses the same --database-url, instead of the test client.")
+    parser.add_argument('--concurrency', type=int, default=1, help="Parallel clients for --url runs.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report here as well as to stdout.")
+    parser.add_argument('--compare', help="Baseline JSON report; exit 1 if any metric regressed.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed relative slowdown for --compare.")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this many milliseconds in --compare.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='car-bench-'), 'bench.db')}"
+    # The app reads its configuration at import time.
+    os.environ['DATABASE_URL'] = database_url
+
+    import app as app_module
+    from benchmarks.datagen import seed_database
+    from benchmarks.runner import bench_live, bench_routes, bench_scoring, compare
+    from benchmarks.startup import measure_startup
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'database': database_url.split(':', 1)[0],
+            'users': args.users,
+            'cars_per_user': args.cars_per_user,
+            'requests_per_route': args.requests,
+            'mode': 'live' if args.url else 'test_client',
+        },
+    }
+
+    if args.startup:
+        # Before seeding, so the probe sees the same empty tables a fresh deploy would.
+        report['startup'] = measure_startup(database_url)
+
+    if not args.skip_routes:
+        started = time.perf_counter()
+        usernames = seed_database(app_module, args.users, args.cars_per_user, seed=args.seed)
+        report['meta']['seed_seconds'] = round(time.perf_counter() - started, 2)
+        if args.url:
+            report['routes'] = bench_live(args.url, usernames, args.requests, args.login_requests,
+                                          args.add_car_requests, args.concurrency, seed=args.seed)
+        else:
+            report['routes'] = bench_routes(app_module, usernames, args.requests, args.login_requests,
+                                            args.add_car_requests, seed=args.seed)
+
+    if not args.skip_scoring:
+        sizes = [int(size) for size in args.scoring_sizes.split(',') if size]
+        report['scoring'] = bench_scoring(app_module.calculate_scores, sizes, seed=args.seed)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
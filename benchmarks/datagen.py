@@ -0,0 +1,97 @@
+import random
+
+from werkzeug.security import generate_password_hash
+
+# --------------------
+# Synthetic Data
+# --------------------
+COMPANIES = ('Toyota', 'Honda', 'Ford', 'Chevrolet', 'BMW', 'Audi', 'Mercedes', 'Hyundai', 'Kia', 'Volvo',
+             'Subaru', 'Mazda', 'Porsche', 'Tesla', 'Lexus')
+ENGINES = (  # (cylinders, min litres, max litres, min hp, max hp)
+    (3, 1.0, 1.5, 70, 140),
+    (4, 1.4, 2.5, 110, 320),
+    (6, 2.5, 3.8, 240, 450),
+    (8, 4.0, 6.2, 380, 720),
+    (12, 5.2, 6.8, 550, 800),
+)
+LOAN_TERMS = (24, 36, 48, 60, 60, 72, 72, 84)
+BENCH_PASSWORD = 'bench-password'
+
+
+def car_record(rng):
+    """One car as add_car form fields, with loosely realistic correlations."""
+    cylinders, min_litres, max_litres, min_hp, max_hp = rng.choice(ENGINES)
+    price = round(rng.uniform(18000, 35000) * (1 + cylinders / 6), -2)
+    record = {
+        'company': rng.choice(COMPANIES),
+        'model': f"Trim {rng.randint(1, 40)}",
+        'horsepower': str(rng.randint(min_hp, max_hp)),
+        'engine_displacement': f"{rng.uniform(min_litres, max_litres):.1f}",
+        'cylinders': str(cylinders),
+        'touchscreen_size': f"{rng.choice((7, 8, 8.8, 10.25, 12.3, 14.5))}",
+        'climate_control_type': rng.choice(('yes', 'no')),
+        'car_price': f"{price:.2f}",
+        'down_payment': f"{price * rng.uniform(0.1, 0.3):.2f}",
+        'interest_rate': f"{rng.uniform(0, 12):.2f}",
+        'loan_term': str(rng.choice(LOAN_TERMS)),
+        'trade_in_value': f"{rng.choice((0, 0, 2500, 5000, 9000))}",
+        'additional_costs': f"{rng.uniform(500, 4000):.2f}",
+    }
+    for checkbox, odds in (('premium_upholstery', 0.4), ('ventilated_seats', 0.25), ('heated_steering', 0.3)):
+        if rng.random() < odds:
+            record[checkbox] = 'on'
+    return record
+
+
+def car_records(count, seed=0):
+    """Yield ``(line_number, record)`` pairs in the shape import_cars expects."""
+    rng = random.Random(seed)
+    for line_number in range(1, count + 1):
+        yield line_number, car_record(rng)
+
+
+def seed_database(app_module, users=1, cars_per_user=100, seed=0):
+    """Create ``users`` bench users with ``cars_per_user`` cars each.
+
+    Returns the usernames; every user's password is ``BENCH_PASSWORD``.
+    """
+    db = app_module.db
+    password = generate_password_hash(BENCH_PASSWORD, method='pbkdf2:sha256')
+    usernames = []
+    with app_module.app.app_context():
+        db.create_all()
+        for index in range(users):
+            username = f"bench-{seed}-{index}"
+            user = app_module.User.query.filter_by(username=username).first()
+            if user is None:
+                user = app_module.User(username=username, password=password)
+                db.session.add(user)
+                db.session.commit()
+                with db.engine.connect() as connection:
+                    app_module.import_cars(connection, user.id, car_records(cars_per_user, seed=seed * 1000 + index))
+            usernames.append(username)
+        db.session.remove()
+    return usernames
+
+
+class FakeCar:
+    """Stand-in with the attributes calculate_scores reads, for microbenchmarks."""
+
+    def __init__(self, record):
+        self.company = record['company']
+        self.horsepower = int(record['horsepower'])
+        self.engine_capacity = float(record['engine_displacement'])
+        self.cylinders = int(record['cylinders'])
+        self.interior = self
+        self.leather_seats = 'premium_upholstery' in record
+        self.ventilated_seats = 'ventilated_seats' in record
+        self.heated_steering = 'heated_steering' in record
+        self.infotainment_size = float(record['touchscreen_size'])
+        self.finance = self
+        self.downpayment = float(record['down_payment'])
+        self.interest_rate = float(record['interest_rate'])
+        self.loan_term = int(record['loan_term'])
+
+
+def fake_cars(count, seed=0):
+    return [FakeCar(record) for _, record in car_records(count, seed)]
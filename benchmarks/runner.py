@@ -0,0 +1,183 @@
+import http.cookiejar
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import event
+
+from benchmarks.datagen import BENCH_PASSWORD, car_records, fake_cars
+
+# --------------------
+# Measurement
+# --------------------
+READ_ROUTES = ('/dashboard', '/api/cars', '/results')
+
+
+def summarize(latencies, statements=None, wall_time=None, errors=0):
+    """Latency percentiles (ms), throughput and SQL statement counts."""
+    latencies = np.asarray(latencies, dtype=float) * 1000
+    if not len(latencies):
+        return {'requests': 0, 'errors': errors}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(latencies.mean()), 3),
+        'min_ms': round(float(latencies.min()), 3),
+        'throughput_rps': round(len(latencies) / (wall_time or latencies.sum() / 1000), 1),
+    }
+    if statements is not None:
+        summary['sql_statements_mean'] = round(float(np.mean(statements)), 2)
+        summary['sql_statements_max'] = int(np.max(statements))
+    return summary
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+
+
+def _ok(status):
+    return 200 <= status < 400
+
+
+def bench_routes(app_module, usernames, requests_per_route=50, login_requests=5, add_car_requests=10, seed=0):
+    """Drive the main routes in-process through the Flask test client."""
+    flask_app = app_module.app
+    with flask_app.app_context():
+        engine = app_module.db.engine
+    clients = [(username, flask_app.test_client()) for username in usernames]
+    new_cars = car_records(add_car_requests * len(clients), seed=seed + 7919)
+    login_form = lambda username: {'username': username, 'password': BENCH_PASSWORD}
+
+    plan = [('POST /login', login_requests, lambda username, client: client.post('/login', data=login_form(username)))]
+    plan += [(f"GET {path}", requests_per_route, lambda username, client, path=path: client.get(path))
+             for path in READ_ROUTES]
+    plan += [('POST /add_car', add_car_requests,
+              lambda username, client: client.post('/add_car', data=next(new_cars)[1]))]
+
+    for username, client in clients:
+        client.post('/login', data=login_form(username))
+
+    report = {}
+    with StatementCounter(engine) as counter:
+        for name, count, send in plan:
+            latencies, statements, errors = [], [], 0
+            for i in range(count * len(clients)):
+                username, client = clients[i % len(clients)]
+                counter.count = 0
+                started = time.perf_counter()
+                response = send(username, client)
+                latencies.append(time.perf_counter() - started)
+                statements.append(counter.count)
+                errors += not _ok(response.status_code)
+            report[name] = summarize(latencies, statements, errors=errors)
+    return report
+
+
+def bench_live(base_url, usernames, requests_per_route=50, login_requests=5, add_car_requests=10, concurrency=1,
+               seed=0):
+    """Drive the same routes as bench_routes against a running server, e.g. a local gunicorn."""
+    base_url = base_url.rstrip('/')
+
+    def session(username):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        return username, opener
+
+    def send(opener, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data else None
+        started = time.perf_counter()
+        try:
+            with opener.open(base_url + path, data=body) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return time.perf_counter() - started, status
+
+    sessions = [session(username) for username in usernames]
+    new_cars = car_records(add_car_requests * len(sessions), seed=seed + 7919)
+    login_form = lambda username: {'username': username, 'password': BENCH_PASSWORD}
+    plan = [('POST /login', login_requests, '/login', login_form)]
+    plan += [(f"GET {path}", requests_per_route, path, None) for path in READ_ROUTES]
+    plan += [('POST /add_car', add_car_requests, '/add_car', lambda username: next(new_cars)[1])]
+
+    for username, opener in sessions:
+        send(opener, '/login', login_form(username))
+
+    report = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, count, path, form in plan:
+            jobs = []
+            for i in range(count * len(sessions)):
+                username, opener = sessions[i % len(sessions)]
+                jobs.append((opener, path, form(username) if form else None))
+            started = time.perf_counter()
+            results = list(pool.map(lambda job: send(*job), jobs))
+            wall_time = time.perf_counter() - started
+            report[name] = summarize([latency for latency, _ in results], wall_time=wall_time,
+                                     errors=sum(not _ok(status) for _, status in results))
+    return report
+
+
+def bench_scoring(calculate_scores, sizes=(10, 100, 1000, 10000), repeat=20, seed=0):
+    """Microbenchmark calculate_scores on in-memory cars of each size."""
+    report = {}
+    for size in sizes:
+        cars = fake_cars(size, seed=seed)
+        calculate_scores(cars)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            calculate_scores(cars)
+            timings.append(time.perf_counter() - started)
+        summary = summarize(timings)
+        summary['per_car_us'] = round(summary['p50_ms'] * 1000 / size, 3)
+        report[str(size)] = summary
+    return report
+
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=1.0, min_delta_statements=0.5):
+    """List the metrics in ``current`` that are worse than ``baseline`` by more than ``threshold``.
+
+    A change must also exceed ``min_delta_ms`` (or ``min_delta_statements``)
+    in absolute terms: sub-millisecond timings easily swing by half between
+    two runs of the same code. Scoring compares the best of the repeats,
+    which is far steadier than the median.
+    """
+    def worse(before, after, floor):
+        return before is not None and after is not None and after > before * (1 + threshold) and after - before > floor
+
+    regressions = []
+    checks = [('routes', 'p95_ms', min_delta_ms), ('routes', 'sql_statements_mean', min_delta_statements),
+              ('scoring', 'min_ms', min_delta_ms)]
+    for section, metric, floor in checks:
+        for name, now in current.get(section, {}).items():
+            then = baseline.get(section, {}).get(name, {})
+            # Baselines written before min_ms existed fall back to the median.
+            key = metric if metric in then else {'min_ms': 'p50_ms'}.get(metric, metric)
+            before, after = then.get(key), now.get(key)
+            if worse(before, after, floor):
+                regressions.append(f"{section} {name} {key}: {before} -> {after}")
+    for metric, after in current.get('startup', {}).items():
+        before = baseline.get('startup', {}).get(metric)
+        if worse(before, after, min_delta_ms):
+            regressions.append(f"startup {metric}: {before} -> {after}")
+    return regressions
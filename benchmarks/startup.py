@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# --------------------
+# Cold Start
+# --------------------
+# Each run is a fresh interpreter, the way a gunicorn worker or a CLI
+# command starts.
+
+# The schema is created in its own process first, so the timed probe's
+# failed login runs the real users-table lookup instead of an error path.
+SETUP = """
+import app
+with app.app.app_context():
+    app.db.create_all()
+"""
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+page = client.get('/login')
+first_request = time.perf_counter()
+login = client.post('/login', data={'username': 'startup-probe', 'password': 'x'})
+first_db_request = time.perf_counter()
+print(json.dumps({
+    'statuses': [page.status_code, login.status_code],
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (first_request - imported) * 1000,
+    'first_db_request_ms': (first_db_request - first_request) * 1000,
+}))
+"""
+# GET /login renders; a failed login redirects back to it.
+EXPECTED_STATUSES = [200, 302]
+
+
+def measure_startup(database_url, runs=5):
+    """Median import time and first-request latencies over ``runs`` fresh processes."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run([sys.executable, '-c', SETUP], cwd=root, env=env, capture_output=True, check=True)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], cwd=root, env=env, capture_output=True,
+                                text=True, check=True).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        statuses = sample.pop('statuses')
+        if statuses != EXPECTED_STATUSES:
+            raise RuntimeError(f"startup probe got HTTP {statuses}, expected {EXPECTED_STATUSES}")
+        samples.append(sample)
+    return {name: round(float(np.median([sample[name] for sample in samples])), 2) for name in samples[0]}
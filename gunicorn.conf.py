@@ -0,0 +1,57 @@
+# Gunicorn settings for production; every value can be overridden from the
+# environment, e.g. WEB_CONCURRENCY=4 GUNICORN_THREADS=8.
+import glob
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+# Workers share their metrics through files so /metrics covers all of them.
+# This has to happen here, at import: with preload_app the app reads its
+# configuration before any server hook runs.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f"car-app-metrics-{os.getenv('PORT', '8000')}"))
+os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+
+# Requests spend most of their time waiting on PostgreSQL, so a few threads
+# per worker raise throughput without more processes. Keep DB_POOL_SIZE at
+# least as large as the thread count.
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Import the app once in the master so workers fork with it ready.
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+
+def on_starting(server):
+    # Per-worker metric files from a previous run would otherwise be summed in.
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], 'metrics-*.json')):
+        os.remove(path)
+
+
+def post_fork(server, worker):
+    # With preload_app the master may have opened pooled connections; a
+    # forked worker must never reuse them.
+    from app import application, dispose_engines_after_fork, metrics
+    dispose_engines_after_fork(application)
+    metrics.start_flush_thread()
+
+
+def worker_exit(server, worker):
+    # Flushes are throttled, so write out whatever the last second recorded.
+    from app import metrics
+    metrics.flush(force=True)
+
+
+def child_exit(server, worker):
+    # Fold the exited worker's metrics into the aggregate file, so worker
+    # restarts (max_requests) do not pile up files for /metrics to read.
+    from metrics import Metrics
+    Metrics(directory=os.environ['METRICS_DIR']).mark_process_dead(worker.pid)
@@ -0,0 +1,221 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --------------------
+# Metrics Registry
+# --------------------
+# Counters and histograms live in plain dicts in each process, so recording
+# costs a lock and a couple of additions. When METRICS_DIR is set (gunicorn
+# with several workers), every process also writes its totals to its own
+# file at most once per flush interval, and /metrics sums all the files.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Totals of workers that have exited, see Metrics.mark_process_dead.
+AGGREGATE_FILE = 'metrics-aggregate.json'
+
+
+def _write_json(path, data):
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Metrics:
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.help = {}
+        self.buckets = {}
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def counter(self, name, help_text):
+        self.help[name] = ('counter', help_text)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.help[name] = ('histogram', help_text)
+        self.buckets[name] = tuple(buckets)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_total(self, name, value, **labels):
+        """Overwrite a counter with a running total kept elsewhere."""
+        with self._lock:
+            self._counters[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        buckets = self.buckets[name]
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(buckets)] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(series)] for (name, labels), series in self._histograms.items()],
+            }
+
+    # --------------------
+    # Multi-process support
+    # --------------------
+    def _path(self):
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def start_flush_thread(self):
+        """Flush every interval from a daemon thread, e.g. after a gunicorn fork.
+
+        Request-driven flushes alone would leave an idle worker's last few
+        updates out of every scrape until it serves another request.
+        """
+        if not self.directory:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                self.flush()
+
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        # Request threads and the flush thread share one temporary file.
+        with self._flush_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(self._path(), self.snapshot())
+
+    @contextmanager
+    def _directory_lock(self):
+        # Serializes scrapes with the merging of dead workers' files, so a
+        # scrape never sees a worker both merged and still on its own. Only
+        # gunicorn merges files, so there is nothing to lock without fcntl
+        # (Windows).
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _sum_files(paths):
+        counters, histograms = {}, {}
+        for path in paths:
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, series in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                total = histograms.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return {
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), series] for (name, labels), series in histograms.items()],
+        }
+
+    def collect(self):
+        """Totals across every process that has written to METRICS_DIR."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush(force=True)
+        with self._directory_lock():
+            return self._sum_files(glob.glob(os.path.join(self.directory, 'metrics-*.json')))
+
+    def mark_process_dead(self, pid):
+        """Fold an exited worker's file into the aggregate file and delete it.
+
+        Called from gunicorn's child_exit hook, so restarted workers do not
+        leave one more file behind for every later scrape to read.
+        """
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"metrics-{pid}.json")
+        with self._directory_lock():
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")
+            if not os.path.exists(path):
+                return
+            aggregate = os.path.join(self.directory, AGGREGATE_FILE)
+            _write_json(aggregate, self._sum_files([aggregate, path]))
+            os.remove(path)
+
+    # --------------------
+    # Prometheus text format
+    # --------------------
+    def render(self):
+        snapshot = self.collect()
+        series_by_name = {}
+        for name, labels, value in snapshot['counters']:
+            series_by_name.setdefault(name, []).append((labels, value))
+        for name, labels, series in snapshot['histograms']:
+            series_by_name.setdefault(name, []).append((labels, series))
+
+        lines = []
+        for name in sorted(series_by_name):
+            kind, help_text = self.help.get(name, ('untyped', ''))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series_by_name[name], key=lambda item: item[0]):
+                if kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets[name] + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,179 @@
+import numpy as np
+
+# --------------------
+# Columnar Scoring Engine
+# --------------------
+# Every formula here mirrors the per-car loop that used to live in
+# calculate_scores, but works on whole NumPy columns at once.
+
+TOP_K = 3
+
+
+def _column(cars, getter, convert=float):
+    # Converting each value explicitly keeps the old failure mode: a NULL
+    # field raises instead of silently turning into NaN.
+    dtype = np.float64 if convert is float else np.int64
+    return np.fromiter((convert(getter(car)) for car in cars), dtype=dtype, count=len(cars))
+
+
+def load_columns(cars):
+    """Pull the scoring inputs of ``cars`` into NumPy arrays."""
+    return {
+        'horsepower': _column(cars, lambda car: car.horsepower),
+        'engine_capacity': _column(cars, lambda car: car.engine_capacity),
+        'cylinders': _column(cars, lambda car: car.cylinders),
+        'leather_seats': _column(cars, lambda car: car.interior.leather_seats, int),
+        'ventilated_seats': _column(cars, lambda car: car.interior.ventilated_seats, int),
+        'heated_steering': _column(cars, lambda car: car.interior.heated_steering, int),
+        'infotainment_size': _column(cars, lambda car: car.interior.infotainment_size),
+        'downpayment': _column(cars, lambda car: car.finance.downpayment),
+        'interest_rate': _column(cars, lambda car: car.finance.interest_rate),
+        'loan_term': _column(cars, lambda car: car.finance.loan_term, int),
+    }
+
+
+def round_values(values, digits):
+    """Round like Python's ``round()``, which the displayed scores always used.
+
+    ``np.round`` scales, rounds and scales back, so a value such as 45.45
+    (stored as 45.4500000000000028...) can land on the other side of the
+    tie. Both agree away from ties, so only the few values whose scaled
+    fraction sits near .5 are re-rounded in Python.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, digits)
+    scaled = np.abs(values) * 10.0 ** digits
+    with np.errstate(invalid='ignore'):  # inf is never near a tie
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(scaled, 1)
+    if near_tie.any():
+        flat, source = rounded.reshape(-1), values.reshape(-1)
+        for i in np.flatnonzero(near_tie.reshape(-1)):
+            flat[i] = round(float(source[i]), digits)
+    return rounded
+
+
+def normalization_max(values):
+    # Same guard as `max(...) or 1`: a zero maximum would divide by zero.
+    return float(np.max(values)) or 1
+
+
+def perf_scores(horsepower, engine_capacity, cylinders, max_hp=None, max_engine=None, max_cylinders=None):
+    """Performance score (0-100) relative to the best car in the set."""
+    max_hp = normalization_max(horsepower) if max_hp is None else max_hp
+    max_engine = normalization_max(engine_capacity) if max_engine is None else max_engine
+    max_cylinders = normalization_max(cylinders) if max_cylinders is None else max_cylinders
+    return (
+        (horsepower / max_hp * 40) +
+        (engine_capacity / max_engine * 30) +
+        (cylinders / max_cylinders * 30)
+    )
+
+
+def interior_scores(leather_seats, ventilated_seats, heated_steering, infotainment_size):
+    """Interior score (0-100); screens are capped at 20 points for 10"+."""
+    return (
+        20 * leather_seats +
+        15 * ventilated_seats +
+        10 * heated_steering +
+        np.minimum(infotainment_size * 2, 20)
+    )
+
+
+def total_costs(downpayment, interest_rate, loan_term):
+    """Total amount paid over the loan term.
+
+    The old month loop added ``downpayment * r * (1 + r) ** month`` for every
+    month on top of the down payment. That geometric series sums to
+    ``downpayment * ((1 + r) ** n - 1)``, so the whole total collapses to
+    ``downpayment * (1 + r) ** n``, which also holds for a zero rate.
+    """
+    monthly_interest = np.asarray(interest_rate, dtype=float) / 100 / 12
+    months = np.maximum(loan_term, 0)
+    # Absurd loans overflow to inf, which the JSON views send as null.
+    with np.errstate(over='ignore'):
+        return downpayment * (1 + monthly_interest) ** months
+
+
+def value_scores(perf, interior, total):
+    """Points per $1000 of total cost; zero when nothing is paid."""
+    total = np.asarray(total, dtype=float)
+    scores = np.zeros(np.broadcast(perf, interior, total).shape)
+    np.divide(perf + interior, total / 1000, out=scores, where=total != 0)
+    return scores
+
+
+def scenario_grid(perf, interior, interest_rates, loan_terms, downpayments, trade_ins):
+    """Total cost and value score for every finance combination of one car.
+
+    The four parameter lists are broadcast against each other, so the result
+    arrays have shape ``(rates, terms, down payments, trade-ins)`` and ravel
+    in the same order as ``itertools.product``. A trade-in reduces the amount
+    that accrues interest, never below zero.
+    """
+    rates = np.asarray(interest_rates, dtype=float)[:, None, None, None]
+    terms = np.asarray(loan_terms, dtype=np.int64)[None, :, None, None]
+    financed = np.maximum(np.subtract.outer(np.asarray(downpayments, dtype=float),
+                                            np.asarray(trade_ins, dtype=float)), 0)[None, None]
+    total = total_costs(financed, rates, terms)
+    return total, value_scores(perf, interior, total)
+
+
+def top_k(values, k=TOP_K, descending=True):
+    """Indices of the ``k`` best ``values``, in rank order.
+
+    Uses a partial partition to find the cut-off value, then a stable sort of
+    only the candidates at or beyond it, so ties keep their original order
+    exactly like ``sorted(...)[:k]`` did.
+    """
+    n = len(values)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.intp)
+    keys = -values if descending else values
+    if k < n:
+        cutoff = np.partition(keys, k - 1)[k - 1]
+        candidates = np.flatnonzero(keys <= cutoff)
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(keys[candidates], kind='stable')
+    return candidates[order][:k]
+
+
+def score_columns(columns):
+    """Compute the rounded score columns for a set of loaded cars."""
+    perf = perf_scores(columns['horsepower'], columns['engine_capacity'], columns['cylinders'])
+    interior = interior_scores(columns['leather_seats'], columns['ventilated_seats'],
+                               columns['heated_steering'], columns['infotainment_size'])
+    total = total_costs(columns['downpayment'], columns['interest_rate'], columns['loan_term'])
+    value = value_scores(perf, interior, total)
+    return {
+        'perf_score': round_values(perf, 1),
+        'interior_score': round_values(interior, 1),
+        'total_cost': round_values(total, 2),
+        'value_score': round_values(value, 2),
+    }
+
+
+def rank_cars(cars, k=TOP_K):
+    """Return the top ``k`` cars by performance, by value and by lowest cost."""
+    if not cars:
+        return [], [], []
+
+    scores = score_columns(load_columns(cars))
+
+    def build(indices):
+        return [
+            {
+                'car': cars[i],
+                'perf_score': float(scores['perf_score'][i]),
+                'interior_score': float(scores['interior_score'][i]),
+                'total_cost': float(scores['total_cost'][i]),
+                'value_score': float(scores['value_score'][i]),
+            }
+            for i in indices
+        ]
+
+    return (
+        build(top_k(scores['perf_score'], k)),
+        build(top_k(scores['value_score'], k)),
+        build(top_k(scores['total_cost'], k, descending=False)),
+    )
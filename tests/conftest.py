@@ -0,0 +1,86 @@
+import os
+import sys
+
+import pytest
+from flask import g
+from flask.testing import FlaskClient
+from werkzeug.security import generate_password_hash
+
+# Always run the suite against an in-memory SQLite database. DATABASE_URL
+# may point at a real PostgreSQL instance, and the fixtures drop every table.
+os.environ['DATABASE_URL'] = 'sqlite://'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class RequestScopedClient(FlaskClient):
+    """Test client that gives every request a fresh login state.
+
+    The ``app`` fixture holds one app context for the whole test, so ``g`` --
+    where Flask-Login keeps the loaded user -- would otherwise outlive the
+    request the way it never does in production.
+    """
+
+    def open(self, *args, **kwargs):
+        g.pop('_login_user', None)
+        return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def app():
+    from app import app as flask_app, db, user_cache
+
+    uri = flask_app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite:'):
+        pytest.exit(f"refusing to run tests against {uri.split('@')[-1]}", returncode=1)
+    flask_app.config.update(TESTING=True)
+    flask_app.test_client_class = RequestScopedClient
+    with flask_app.app_context():
+        user_cache.clear()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    from app import db, User
+
+    def make(username='driver', password='secret'):
+        user = User(username=username, password=generate_password_hash(password, method='pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def add_cars(app):
+    from app import db, Car, Interior, Finance
+
+    def add(user, count, start=0):
+        for i in range(start, start + count):
+            car = Car(user_id=user.id, company=f"Company {i}", dealership="Dealer",
+                      horsepower=100 + i, engine_capacity=1.5 + i % 4, cylinders=4 + 2 * (i % 3))
+            car.interior = Interior(leather_seats=i % 2 == 0, ventilated_seats=i % 3 == 0,
+                                    infotainment_size=8.0 + i % 5, heated_steering=i % 4 == 0)
+            car.finance = Finance(purchase_type='buy', downpayment=5000.0 + 100 * i, interest_rate=4.5,
+                                  loan_term=36 + 12 * (i % 4), car_price=30000.0 + 500 * i)
+            db.session.add(car)
+        db.session.commit()
+
+    return add
+
+
+@pytest.fixture
+def login(client):
+    def log_in(username='driver', password='secret'):
+        return client.post('/login', data={'username': username, 'password': password})
+
+    return log_in
@@ -0,0 +1,87 @@
+import pytest
+
+from app import db, Car, CarScore, encode_cursor
+
+
+def walk(client, **params):
+    cars, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        response = client.get('/api/cars', query_string=query)
+        assert response.status_code == 200
+        data = response.get_json()
+        cars.extend(data['cars'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return cars, pages
+
+
+@pytest.fixture
+def garage(make_user, add_cars, login):
+    user = make_user()
+    add_cars(user, 23)
+    # Duplicate sort values make sure the id tie-break keeps pages disjoint.
+    for car in Car.query.filter(Car.id % 5 == 0):
+        car.horsepower = 150
+    db.session.commit()
+    other = make_user('other')
+    add_cars(other, 4)
+    login()
+    return user
+
+
+@pytest.mark.parametrize('sort', ['horsepower', 'car_price', 'total_cost'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_keyset_pages_cover_every_car_once(client, garage, sort, order):
+    cars, pages = walk(client, sort=sort, order=order, limit=5)
+
+    assert pages == 5
+    assert sorted(car['id'] for car in cars) == sorted(car.id for car in Car.query.filter_by(user_id=garage.id))
+    keys = [((car['finance']['car_price'] if sort == 'car_price' else car[sort]), car['id']) for car in cars]
+    assert keys == sorted(keys, reverse=order == 'desc')
+
+
+def test_filters(client, garage):
+    cars, _ = walk(client, min_hp=110, max_hp=120, leather_seats='true', max_price=40000)
+
+    assert cars
+    for car in cars:
+        assert 110 <= car['horsepower'] <= 120
+        assert car['interior']['leather_seats'] is True
+        assert car['finance']['car_price'] <= 40000
+
+    cars, _ = walk(client, company='Company 3')
+    assert [car['company'] for car in cars] == ['Company 3']
+
+
+@pytest.mark.parametrize('params', [
+    {'sort': 'torque'},
+    {'order': 'sideways'},
+    {'min_hp': 'lots'},
+    {'heated_steering': 'maybe'},
+    {'cursor': 'not-a-cursor'},
+    {'cursor': encode_cursor(10 ** 30, 1)},
+    {'cursor': encode_cursor(100, 2 ** 63)},
+])
+def test_bad_parameters(client, garage, params):
+    response = client.get('/api/cars', query_string=params)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_requires_login(client):
+    assert client.get('/api/cars').status_code == 302
+
+
+def test_overflowed_scores_are_null(client, garage):
+    car_id = Car.query.filter_by(user_id=garage.id).first().id
+    db.session.execute(db.update(CarScore).where(CarScore.car_id == car_id)
+                       .values(total_cost=float('inf'), value_score=0.0))
+    db.session.commit()
+
+    response = client.get('/api/cars', query_string={'sort': 'total_cost', 'order': 'desc', 'limit': 1})
+    assert 'Infinity' not in response.get_data(as_text=True)
+    data = response.get_json()
+    assert data['cars'][0]['id'] == car_id
+    assert data['cars'][0]['total_cost'] is None
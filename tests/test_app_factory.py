@@ -0,0 +1,41 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import create_app, db, dispose_engines_after_fork, engine_options
+
+
+def test_create_app_does_not_connect():
+    connections = []
+
+    def on_connect(dbapi_connection, connection_record):
+        connections.append(dbapi_connection)
+
+    event.listen(Engine, 'connect', on_connect)
+    try:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+        assert connections == []
+        with app.app_context():
+            db.create_all()
+        assert len(connections) == 1
+    finally:
+        event.remove(Engine, 'connect', on_connect)
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '12')
+    monkeypatch.setenv('DB_POOL_PRE_PING', '0')
+    options = engine_options('postgresql://localhost/car_db')
+    assert options['pool_size'] == 12
+    assert options['pool_pre_ping'] is False
+    assert options['pool_recycle'] == 1800
+    assert engine_options('sqlite:///cars.db') == {}
+
+
+def test_dispose_after_fork_keeps_the_app_usable(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'cars.db'}"})
+    with app.app_context():
+        db.create_all()
+    dispose_engines_after_fork(app)
+    with app.app_context():
+        assert db.engine.pool.checkedin() == 0
+    assert app.test_client().get('/login').status_code == 200
@@ -0,0 +1,69 @@
+import threading
+
+from werkzeug.serving import make_server
+
+import app as app_module
+from benchmarks.datagen import car_records, seed_database
+from benchmarks.runner import bench_live, bench_routes, bench_scoring, compare
+from benchmarks.startup import measure_startup
+
+
+def test_generated_records_pass_add_car_validation():
+    for _, record in car_records(50, seed=3):
+        car, interior, finance = app_module.parse_car_fields(record)
+        assert finance['loan_term'] in (24, 36, 48, 60, 72, 84)
+
+
+def test_route_benchmark_smoke(app):
+    usernames = seed_database(app_module, users=1, cars_per_user=30)
+    report = bench_routes(app_module, usernames, requests_per_route=3, login_requests=1, add_car_requests=2)
+
+    assert set(report) == {'POST /login', 'GET /dashboard', 'GET /api/cars', 'GET /results', 'POST /add_car'}
+    for summary in report.values():
+        assert summary['errors'] == 0
+        assert summary['p50_ms'] <= summary['p95_ms'] <= summary['p99_ms']
+    assert report['GET /results']['sql_statements_max'] == 4
+
+
+def test_scoring_benchmark_and_compare():
+    report = {'scoring': bench_scoring(app_module.calculate_scores, sizes=(10, 200), repeat=3)}
+    assert set(report['scoring']) == {'10', '200'}
+
+    before = report['scoring']['10']['min_ms']
+    slower = {'scoring': {'10': dict(report['scoring']['10'], min_ms=before * 3 + 2)}}
+    assert compare(report, report) == []
+    assert compare(report, slower) == [f"scoring 10 min_ms: {before} -> {before * 3 + 2}"]
+
+
+def test_compare_ignores_sub_millisecond_noise():
+    baseline = {'scoring': {'10': {'p50_ms': 0.195, 'min_ms': 0.18}},
+                'routes': {'GET /results': {'p95_ms': 2.0, 'sql_statements_mean': 4.0}}}
+    noisy = {'scoring': {'10': {'p50_ms': 0.351, 'min_ms': 0.3}},
+             'routes': {'GET /results': {'p95_ms': 2.9, 'sql_statements_mean': 4.2}}}
+    assert compare(baseline, noisy) == []
+    assert compare(baseline, noisy, min_delta_ms=0.1, min_delta_statements=0.1) == [
+        'routes GET /results p95_ms: 2.0 -> 2.9', 'scoring 10 min_ms: 0.18 -> 0.3']
+    # Reports from before min_ms was recorded are compared by their median.
+    old = {'scoring': {'10': {'p50_ms': 0.195}}}
+    assert compare(old, {'scoring': {'10': {'p50_ms': 5.0, 'min_ms': 4.0}}}) == ['scoring 10 p50_ms: 0.195 -> 5.0']
+
+
+def test_live_benchmark_covers_add_car(app):
+    usernames = seed_database(app_module, users=1, cars_per_user=5)
+    server = make_server('127.0.0.1', 0, app, threaded=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        report = bench_live(f"http://127.0.0.1:{server.server_port}", usernames, requests_per_route=1,
+                            login_requests=1, add_car_requests=2)
+    finally:
+        server.shutdown()
+    assert report['POST /add_car']['requests'] == 2
+    assert all(summary['errors'] == 0 for summary in report.values())
+    assert app_module.Car.query.count() == 7
+
+
+def test_startup_probe_times_a_real_login(tmp_path):
+    # A fresh, empty database: the probe must still hit the users table, not a 500.
+    report = measure_startup(f"sqlite:///{tmp_path / 'startup.db'}", runs=1)
+    assert set(report) == {'import_ms', 'first_request_ms', 'first_db_request_ms'}
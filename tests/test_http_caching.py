@@ -0,0 +1,86 @@
+import pytest
+
+from app import db, Car, static_file_hash
+from test_queries import count_statements
+
+
+@pytest.mark.parametrize('path', ['/results', '/dashboard'])
+def test_unchanged_page_revalidates_with_304(client, make_user, add_cars, login, path):
+    user = make_user()
+    add_cars(user, 3)
+    login()
+    client.get(path)  # warm the user loader cache
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in first.headers['Vary']
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+
+    db.session.expunge_all()
+    with count_statements() as statements:
+        again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert len(statements) == 1 and 'user_data_version' in statements[0]
+
+
+def test_etag_changes_with_user_data(client, make_user, add_cars, login):
+    user = make_user()
+    add_cars(user, 2)
+    login()
+    etag = client.get('/results').headers['ETag']
+
+    car = Car.query.filter_by(user_id=user.id).first()
+    car.finance.interest_rate = 9.9
+    db.session.commit()
+    changed = client.get('/results', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+    other = make_user('other')
+    add_cars(other, 2)
+    assert client.get('/results', headers={'If-None-Match': changed.headers['ETag']}).status_code == 304
+
+
+def test_pages_with_flashes_are_not_cached(client, make_user, login):
+    make_user()
+    response = login()
+    assert response.status_code == 302
+    client.get('/logout')
+    login()
+    with client.session_transaction() as session:
+        session['_flashes'] = [('info', 'Hello again')]
+
+    response = client.get('/dashboard')
+    assert 'ETag' not in response.headers
+    assert response.headers['Cache-Control'].startswith('no-store')
+    assert 'Hello again' in response.get_data(as_text=True)
+
+
+def test_static_assets_use_hashed_immutable_urls(app, client):
+    with app.test_request_context():
+        from flask import url_for
+        url = url_for('static', filename='css/style.css')
+    assert url == f"/static/css/style.css?v={static_file_hash('css/style.css')}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    stale = client.get('/static/css/style.css?v=0000')
+    assert stale.headers['Cache-Control'] == 'no-cache'
+
+
+def test_other_pages_stay_uncached(client):
+    assert client.get('/login').headers['Cache-Control'].startswith('no-store')
+
+
+def test_missing_static_files_are_not_hashed(client):
+    static_file_hash.cache_clear()
+    for i in range(5):
+        response = client.get(f'/static/missing-{i}.css?v=abc')
+        assert response.status_code == 404
+    assert static_file_hash.cache_info().currsize == 0
+    assert static_file_hash.cache_info().maxsize is not None
@@ -0,0 +1,145 @@
+import io
+import json
+
+from app import db, Car, CarScore, calculate_scores, load_user_cars, top_scores
+
+HEADER = ('company,model,horsepower,engine_displacement,cylinders,touchscreen_size,premium_upholstery,'
+          'ventilated_seats,heated_steering,car_price,down_payment,interest_rate,loan_term\n')
+
+
+def csv_rows(count):
+    return ''.join(
+        f"Make {i},Dealer {i},{150 + i},{1.5 + i % 3},{4 + 2 * (i % 3)},{8 + i % 4},{'yes' if i % 2 else ''},"
+        f"{'no' if i % 3 else 'on'},,{30000 + 100 * i},{6000 + 50 * i},4.9,{36 + 12 * (i % 3)}\n"
+        for i in range(count)
+    )
+
+
+def test_import_cars_command(app, make_user, tmp_path):
+    user = make_user()
+    source = tmp_path / 'cars.csv'
+    source.write_text(HEADER + csv_rows(7) + 'Broken,Dealer,fast,2.0,4,,,,,30000,5000,4.9,36\n'
+                      + ',Dealer,200,2.0,4,,,,,30000,5000,4.9\n' + csv_rows(3))
+
+    result = app.test_cli_runner().invoke(
+        args=['import-cars', str(source), '--user', 'driver', '--batch-size', '4'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 10 cars' in result.output
+    assert 'rows/sec' in result.output
+    assert 'Rejected 2 rows' in result.output
+    rejects = [json.loads(line) for line in (tmp_path / 'cars.csv.rejects.jsonl').read_text().splitlines()]
+    assert [reject['line'] for reject in rejects] == [9, 10]
+    assert rejects[0]['record']['company'] == 'Broken'
+
+    db.session.expire_all()
+    cars = load_user_cars(user.id, Car.id)
+    assert len(cars) == 10
+    assert cars[1].interior.leather_seats and not cars[0].interior.leather_seats
+    assert cars[0].interior.ventilated_seats and not cars[1].interior.ventilated_seats
+    assert db.session.query(CarScore).count() == 10
+    best_perf, _, cheapest = calculate_scores(cars)
+    assert [r['car'].id for r in top_scores(user.id, CarScore.perf_score.desc())] == [r['car'].id for r in best_perf]
+    assert [r['car'].id for r in top_scores(user.id, CarScore.total_cost)] == [r['car'].id for r in cheapest]
+
+
+def test_values_the_database_would_refuse_are_rejected(app, make_user, tmp_path):
+    make_user()
+    source = tmp_path / 'cars.csv'
+    source.write_text(HEADER + csv_rows(2) + 'Saab,900,185,2.0,4,,,,,30000,nan,4.9,36\n'
+                      + f"{'S' * 51},900,185,2.0,4,,,,,30000,5000,4.9,36\n"
+                      + 'Saab,900,99999999999,2.0,4,,,,,30000,5000,4.9,36\n' + csv_rows(1))
+
+    result = app.test_cli_runner().invoke(args=['import-cars', str(source), '--user', 'driver'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 3 cars' in result.output
+    rejects = [json.loads(line) for line in (tmp_path / 'cars.csv.rejects.jsonl').read_text().splitlines()]
+    assert [(reject['line'], reject['error']) for reject in rejects] == [
+        (4, 'downpayment must be a finite number'),
+        (5, 'company must be at most 50 characters'),
+        (6, 'horsepower is out of range'),
+    ]
+
+
+def test_database_errors_only_reject_the_offending_rows(app, make_user, tmp_path):
+    user = make_user()
+    db.session.execute(db.text(
+        "CREATE TRIGGER no_lemons BEFORE INSERT ON car WHEN NEW.company = 'Lemon' "
+        "BEGIN SELECT RAISE(ABORT, 'no lemons'); END"))
+    db.session.commit()
+    source = tmp_path / 'cars.csv'
+    source.write_text(HEADER + csv_rows(3) + 'Lemon,Dealer,200,2.0,4,,,,,30000,5000,4.9,36\n' + csv_rows(2))
+
+    result = app.test_cli_runner().invoke(
+        args=['import-cars', str(source), '--user', 'driver', '--batch-size', '4'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 5 cars' in result.output
+    rejects = [json.loads(line) for line in (tmp_path / 'cars.csv.rejects.jsonl').read_text().splitlines()]
+    assert [(reject['line'], reject['error']) for reject in rejects] == [(5, 'rejected by the database: no lemons')]
+    assert db.session.query(CarScore).filter_by(user_id=user.id).count() == 5
+
+
+def test_rows_that_are_not_utf8_are_rejected(app, client, make_user, login, tmp_path):
+    make_user()
+    content = (HEADER + csv_rows(2) + 'Citroën,C4,130,1.6,4,,,,,22000,4000,4.9,36\n' + csv_rows(1)).encode('cp1252')
+    source = tmp_path / 'cars.csv'
+    source.write_bytes(content)
+
+    result = app.test_cli_runner().invoke(args=['import-cars', str(source), '--user', 'driver'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 3 cars' in result.output
+    rejects = [json.loads(line) for line in (tmp_path / 'cars.csv.rejects.jsonl').read_text().splitlines()]
+    assert [(reject['line'], reject['error']) for reject in rejects] == [(4, 'not valid UTF-8 text')]
+
+    login()
+    response = client.post('/import_cars', data={'file': (io.BytesIO(content), 'cars.csv')},
+                           content_type='multipart/form-data', follow_redirects=True)
+    page = response.get_data(as_text=True)
+    assert 'Imported 3 cars.' in page
+    assert 'line 4: not valid UTF-8 text' in page
+
+
+def test_import_jsonl_without_rejects(app, make_user, tmp_path):
+    make_user()
+    source = tmp_path / 'cars.jsonl'
+    source.write_text('\n'.join(json.dumps({
+        'company': 'Saab', 'model': '900', 'horsepower': 185, 'engine_displacement': 2.0, 'cylinders': 4,
+        'heated_steering': True, 'car_price': 25000, 'down_payment': 5000, 'interest_rate': 3.5, 'loan_term': 48,
+    }) for _ in range(3)) + '\n')
+
+    result = app.test_cli_runner().invoke(args=['import-cars', str(source), '--user', 'driver'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 3 cars' in result.output
+    assert not (tmp_path / 'cars.jsonl.rejects.jsonl').exists()
+    assert all(car.interior.heated_steering for car in Car.query.all())
+
+
+def test_import_command_requires_known_user(app, tmp_path):
+    source = tmp_path / 'cars.csv'
+    source.write_text(HEADER)
+    result = app.test_cli_runner().invoke(args=['import-cars', str(source), '--user', 'nobody'])
+    assert result.exit_code != 0
+    assert "No user named 'nobody'" in result.output
+
+
+def test_upload_route(client, make_user, login):
+    make_user()
+    login()
+    data = {'file': (io.BytesIO((HEADER + csv_rows(5) + 'Bad,row\n').encode()), 'cars.csv')}
+
+    response = client.post('/import_cars', data=data, content_type='multipart/form-data', follow_redirects=True)
+
+    page = response.get_data(as_text=True)
+    assert 'Imported 5 cars.' in page
+    assert 'Skipped 1 invalid rows (line 7: missing field' in page
+    assert Car.query.count() == 5
+
+
+def test_upload_requires_login(client):
+    response = client.post('/import_cars', data={})
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
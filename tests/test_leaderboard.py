@@ -0,0 +1,88 @@
+import pytest
+
+from app import db, Car, Finance, leaderboard, load_user_cars, _sqlite_power
+from scoring import load_columns, perf_scores, interior_scores, total_costs, value_scores
+
+
+def python_leaderboard(users, metric, company=None, k=10):
+    entries = []
+    for user in users:
+        cars = load_user_cars(user.id)
+        columns = load_columns(cars)
+        perf = perf_scores(columns['horsepower'], columns['engine_capacity'], columns['cylinders'])
+        interior = interior_scores(columns['leather_seats'], columns['ventilated_seats'],
+                                   columns['heated_steering'], columns['infotainment_size'])
+        total = total_costs(columns['downpayment'], columns['interest_rate'], columns['loan_term'])
+        value = value_scores(perf, interior, total)
+        raw = {'perf_score': perf, 'interior_score': interior, 'total_cost': total, 'value_score': value}
+        for i, car in enumerate(cars):
+            if company is None or car.company == company:
+                entries.append((car, {name: values[i] for name, values in raw.items()}))
+
+    sign = 1 if metric == 'total_cost' else -1
+    entries.sort(key=lambda entry: (sign * entry[1][metric], entry[0].id))
+    return [
+        (car.id, round(float(s['perf_score']), 1), round(float(s['interior_score']), 1),
+         round(float(s['total_cost']), 2), round(float(s['value_score']), 2))
+        for car, s in entries[:k]
+    ]
+
+
+@pytest.fixture
+def market(make_user, add_cars):
+    users = [make_user(f"user{i}") for i in range(3)]
+    for i, user in enumerate(users):
+        add_cars(user, 8 + 3 * i, start=10 * i)
+    for car in Car.query.filter(Car.id % 3 == 0):
+        car.company = 'Volvo'
+    db.session.commit()
+    return users
+
+
+@pytest.mark.parametrize('metric', ['value_score', 'perf_score', 'total_cost'])
+@pytest.mark.parametrize('company', [None, 'Volvo'])
+def test_matches_python_scoring(market, metric, company):
+    rows = leaderboard(metric, company, k=7)
+    got = [(r['id'], r['perf_score'], r['interior_score'], r['total_cost'], r['value_score']) for r in rows]
+    assert got == python_leaderboard(market, metric, company, k=7)
+    if company:
+        assert {r['company'] for r in rows} == {company}
+
+
+def test_api(client, market, login):
+    login('user0')
+    data = client.get('/api/leaderboard', query_string={'company': 'Volvo', 'limit': 3}).get_json()
+    assert data['metric'] == 'value_score'
+    assert [car['id'] for car in data['cars']] == [entry[0] for entry in python_leaderboard(market, 'value_score', 'Volvo', 3)]
+
+    assert client.get('/api/leaderboard', query_string={'metric': 'torque'}).status_code == 400
+
+
+def test_absurd_loans_cannot_break_the_leaderboard(client, market, login):
+    login('user0')
+    form = {'company': 'Lemon', 'model': 'X', 'horsepower': '100', 'engine_displacement': '2.0',
+            'cylinders': '4', 'car_price': '20000', 'down_payment': '5000', 'interest_rate': '12',
+            'loan_term': '100000'}
+    client.post('/add_car', data=form)
+    client.post('/add_car', data=dict(form, loan_term='60', interest_rate='101'))
+    assert Car.query.filter_by(company='Lemon').count() == 0
+
+    # A row saved before the form enforced its limits.
+    finance = Finance.query.filter_by(car_id=Car.query.filter_by(user_id=market[0].id).first().id).one()
+    finance.loan_term, finance.interest_rate = 100000, 12.0
+    db.session.commit()
+
+    for metric in ('total_cost', 'value_score'):
+        response = client.get('/api/leaderboard', query_string={'metric': metric, 'limit': 100})
+        assert response.status_code == 200
+        assert 'Infinity' not in response.get_data(as_text=True)
+    cars = client.get('/api/leaderboard', query_string={'metric': 'total_cost', 'limit': 100}).get_json()['cars']
+    assert cars[-1]['id'] == finance.car_id
+    assert cars[-1]['total_cost'] is None and cars[-1]['value_score'] == 0
+
+
+def test_sqlite_power_never_raises():
+    assert _sqlite_power(2.0, 10) == 1024.0
+    assert _sqlite_power(1.01, 100000) == float('inf')
+    assert _sqlite_power(-8.0, 1 / 3) is None
+    assert _sqlite_power(None, 2) is None
@@ -0,0 +1,126 @@
+import logging
+import os
+import sys
+
+import metrics as metrics_module
+from metrics import Metrics
+
+
+def test_render_prometheus_text():
+    registry = Metrics()
+    registry.counter('jobs_total', 'Jobs run.')
+    registry.histogram('job_seconds', 'Job latency.', buckets=(0.1, 1.0))
+    registry.inc('jobs_total', kind='a"b')
+    registry.inc('jobs_total', 2, kind='a"b')
+    registry.observe('job_seconds', 0.05)
+    registry.observe('job_seconds', 0.5)
+    registry.observe('job_seconds', 3.0)
+
+    assert registry.render() == (
+        '# HELP job_seconds Job latency.\n'
+        '# TYPE job_seconds histogram\n'
+        'job_seconds_bucket{le="0.1"} 1\n'
+        'job_seconds_bucket{le="1.0"} 2\n'
+        'job_seconds_bucket{le="+Inf"} 3\n'
+        'job_seconds_sum 3.55\n'
+        'job_seconds_count 3\n'
+        '# HELP jobs_total Jobs run.\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{kind="a\\"b"} 3\n'
+    )
+
+
+def test_workers_are_summed_through_the_metrics_dir(tmp_path, monkeypatch):
+    workers = []
+    for pid in (101, 102):
+        registry = Metrics(directory=str(tmp_path), flush_interval=60)
+        registry.counter('hits_total', 'Hits.')
+        registry.inc('hits_total', pid - 100, route='/results')
+        monkeypatch.setattr(metrics_module.os, 'getpid', lambda pid=pid: pid)
+        registry.flush(force=True)
+        workers.append(registry)
+
+    # Throttled: an in-between flush does not rewrite the file.
+    workers[0].inc('hits_total', 10, route='/results')
+    monkeypatch.setattr(metrics_module.os, 'getpid', lambda: 101)
+    workers[0].flush()
+    monkeypatch.setattr(metrics_module.os, 'getpid', lambda: 103)
+
+    assert 'hits_total{route="/results"} 3\n' in Metrics(directory=str(tmp_path)).render()
+
+
+def test_dead_workers_are_folded_into_the_aggregate(tmp_path, monkeypatch):
+    for pid in (101, 102, 103):
+        registry = Metrics(directory=str(tmp_path))
+        registry.histogram('job_seconds', 'Job latency.', buckets=(1.0,))
+        registry.inc('hits_total', pid - 100)
+        registry.observe('job_seconds', 0.5)
+        monkeypatch.setattr(metrics_module.os, 'getpid', lambda pid=pid: pid)
+        registry.flush(force=True)
+
+    monkeypatch.setattr(metrics_module.os, 'getpid', lambda: 104)
+    scraper = Metrics(directory=str(tmp_path))
+    scraper.histogram('job_seconds', 'Job latency.', buckets=(1.0,))
+    before = scraper.render()
+    scraper.mark_process_dead(101)
+    scraper.mark_process_dead(102)
+    scraper.mark_process_dead(999)
+
+    assert sorted(path.name for path in tmp_path.glob('metrics-*.json')) == [
+        'metrics-103.json', 'metrics-104.json', 'metrics-aggregate.json']
+    assert scraper.render() == before
+    assert 'hits_total 6\n' in before
+    assert 'job_seconds_count 3\n' in before
+
+
+def test_metrics_dir_works_without_fcntl(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'fcntl', None)
+    registry = Metrics(directory=str(tmp_path))
+    registry.inc('hits_total', 2)
+    registry.flush(force=True)
+    registry.mark_process_dead(os.getpid())
+    assert [path.name for path in tmp_path.glob('metrics-*.json')] == ['metrics-aggregate.json']
+    monkeypatch.setattr(metrics_module.os, 'getpid', lambda: 999)
+    assert 'hits_total 2\n' in Metrics(directory=str(tmp_path)).render()
+
+
+def test_requests_are_instrumented(app, client, make_user, add_cars, login):
+    user = make_user()
+    add_cars(user, 3)
+    login()
+    assert client.get('/results').status_code == 200
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'car_app_request_duration_seconds_count{method="GET",route="/results"}' in text
+    assert 'car_app_requests_total{method="GET",route="/results",status="200"}' in text
+    assert 'car_app_request_sql_statements_bucket{route="/results",le="3"}' in text
+    assert 'car_app_phase_duration_seconds_count{phase="scoring",route="/results"}' in text
+    assert 'car_app_phase_duration_seconds_count{phase="render",route="/results"}' in text
+    assert 'car_app_user_cache_misses_total' in text
+
+
+def test_slow_query_log(app, client, caplog):
+    app.config['SLOW_QUERY_MS'] = 0
+    try:
+        with caplog.at_level(logging.WARNING):
+            client.get('/login')
+            client.post('/login', data={'username': 'nobody', 'password': 'x'})
+    finally:
+        app.config['SLOW_QUERY_MS'] = 200
+    assert any(record.getMessage().startswith('Slow query') for record in caplog.records)
+
+
+def test_metrics_endpoint_is_restricted(app, client, monkeypatch):
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 404
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.9'}).status_code == 404
+
+    monkeypatch.setitem(app.config, 'METRICS_ALLOWED_NETWORKS', '203.0.113.0/24')
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 200
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 's3cret')
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer s3cret',
+                                           'X-Forwarded-For': '198.51.100.1'}).status_code == 200
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 404
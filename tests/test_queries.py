@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, inspect
+
+from app import db
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.mark.parametrize('path', ['/results', '/api/cars', '/api/cars?sort=total_cost&order=asc'])
+def test_statement_count_is_constant(client, make_user, add_cars, login, path):
+    user = make_user()
+    add_cars(user, 2)
+    login()
+    client.get(path)  # warm the user loader cache
+
+    db.session.expunge_all()
+    with count_statements() as few:
+        assert client.get(path).status_code == 200
+
+    add_cars(user, 40, start=2)
+    db.session.expunge_all()
+    with count_statements() as many:
+        assert client.get(path).status_code == 200
+
+    assert len(many) == len(few)
+
+
+def test_foreign_keys_are_indexed(app):
+    inspector = inspect(db.engine)
+    indexes = {
+        table: {tuple(ix['column_names']): bool(ix['unique']) for ix in inspector.get_indexes(table)}
+        for table in ('car', 'interior', 'finance')
+    }
+    assert ('user_id',) in indexes['car']
+    assert indexes['interior'][('car_id',)] is True
+    assert indexes['finance'][('car_id',)] is True
+
+
+def test_init_db_adds_missing_indexes(app):
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX ix_car_user_id')
+        conn.exec_driver_sql('DROP INDEX ix_finance_car_id')
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+
+    assert result.exit_code == 0
+    names = {ix['name'] for table in ('car', 'finance') for ix in inspect(db.engine).get_indexes(table)}
+    assert {'ix_car_user_id', 'ix_finance_car_id'} <= names
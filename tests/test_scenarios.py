@@ -0,0 +1,132 @@
+import itertools
+
+import pytest
+from sqlalchemy import event
+
+from app import db, CarScore, Finance, SCENARIO_MAX_COMBINATIONS, scenario_scores
+from scoring import perf_scores, total_costs, value_scores
+
+
+@pytest.fixture
+def garage(make_user, add_cars, login):
+    user = make_user()
+    add_cars(user, 5)
+    login()
+    scenario_scores.cache_clear()
+    return user
+
+
+def test_default_grid_matches_stored_scores(client, garage):
+    score = CarScore.query.filter_by(user_id=garage.id).order_by(CarScore.car_id).first()
+    response = client.get(f'/api/cars/{score.car_id}/scenarios')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 1
+    assert body['perf_score'] == score.perf_score
+    assert body['interior_score'] == score.interior_score
+    assert body['scenarios'][0]['total_cost'] == score.total_cost
+    assert body['scenarios'][0]['value_score'] == score.value_score
+    assert body['scenarios'][0]['trade_in_value'] == 0.0
+
+
+def test_grid_covers_every_combination_in_order(client, garage):
+    score = CarScore.query.filter_by(user_id=garage.id).first()
+    rates, terms, downpayments, trade_ins = (0, 3.5, 7), (12, 60), (5000, 20000), (0, 2500, 30000)
+    response = client.get(f'/api/cars/{score.car_id}/scenarios', query_string={
+        'interest_rates': ','.join(map(str, rates)),
+        'loan_terms': ','.join(map(str, terms)),
+        'downpayments': ','.join(map(str, downpayments)),
+        'trade_ins': ','.join(map(str, trade_ins)),
+    })
+    scenarios = response.get_json()['scenarios']
+    assert len(scenarios) == 3 * 2 * 2 * 3
+
+    stats = db.session.execute(db.select(db.func.max(CarScore.horsepower), db.func.max(CarScore.engine_capacity),
+                                         db.func.max(CarScore.cylinders))
+                               .where(CarScore.user_id == garage.id)).one()
+    perf = perf_scores(score.horsepower, score.engine_capacity, score.cylinders, *stats)
+    for scenario, (rate, term, downpayment, trade_in) in zip(scenarios, itertools.product(rates, terms, downpayments, trade_ins)):
+        assert (scenario['interest_rate'], scenario['loan_term'], scenario['downpayment'],
+                scenario['trade_in_value']) == (rate, term, downpayment, trade_in)
+        total = total_costs(max(downpayment - trade_in, 0), rate, term)
+        assert scenario['total_cost'] == round(float(total), 2)
+        assert scenario['value_score'] == round(float(value_scores(perf, score.interior_points, total)), 2)
+
+
+def test_scenarios_are_memoized_and_never_persisted(client, garage):
+    car_id = CarScore.query.filter_by(user_id=garage.id).first().car_id
+    query = {'interest_rates': '1,2,3,4,5', 'loan_terms': '24,36,48,60', 'downpayments': '1000,2000,3000'}
+    finance_rows = Finance.query.count()
+    writes = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith('SELECT'):
+            writes.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        first = client.get(f'/api/cars/{car_id}/scenarios', query_string=query).get_json()
+        second = client.get(f'/api/cars/{car_id}/scenarios', query_string=query).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+
+    assert first == second
+    assert scenario_scores.cache_info().hits == 1
+    assert writes == []
+    assert Finance.query.count() == finance_rows
+
+
+def test_editing_the_car_misses_the_cache(client, garage):
+    car_id = CarScore.query.filter_by(user_id=garage.id).first().car_id
+    before = client.get(f'/api/cars/{car_id}/scenarios').get_json()
+    finance = Finance.query.filter_by(car_id=car_id).one()
+    finance.interest_rate += 2
+    db.session.commit()
+    after = client.get(f'/api/cars/{car_id}/scenarios').get_json()
+    assert scenario_scores.cache_info().misses == 2
+    assert after['scenarios'][0]['total_cost'] > before['scenarios'][0]['total_cost']
+
+
+def test_other_users_cars_are_not_found(client, garage, make_user, add_cars):
+    other = make_user('other')
+    add_cars(other, 1, start=10)
+    car_id = CarScore.query.filter_by(user_id=other.id).one().car_id
+    assert client.get(f'/api/cars/{car_id}/scenarios').status_code == 404
+    assert client.get('/api/cars/9999/scenarios').status_code == 404
+
+
+@pytest.mark.parametrize('query', [
+    {'interest_rates': 'low'},
+    {'loan_terms': '36.5'},
+    {'downpayments': '-100'},
+    {'trade_ins': 'nan'},
+    {'interest_rates': '1e300'},
+    {'interest_rates': '100.5'},
+    {'loan_terms': '601'},
+    {'loan_terms': '99999999999999999999'},
+])
+def test_invalid_grids_are_rejected(client, garage, query):
+    car_id = CarScore.query.filter_by(user_id=garage.id).first().car_id
+    response = client.get(f'/api/cars/{car_id}/scenarios', query_string=query)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_grid_size_is_capped(client, garage):
+    car_id = CarScore.query.filter_by(user_id=garage.id).first().car_id
+    side = int(SCENARIO_MAX_COMBINATIONS ** 0.25) + 1
+    values = ','.join(str(i) for i in range(side))
+    response = client.get(f'/api/cars/{car_id}/scenarios', query_string={
+        'interest_rates': values, 'loan_terms': values, 'downpayments': values, 'trade_ins': values})
+    assert response.status_code == 400
+
+
+def test_overflowing_totals_are_null(client, garage):
+    car_id = CarScore.query.filter_by(user_id=garage.id).first().car_id
+    response = client.get(f'/api/cars/{car_id}/scenarios', query_string={
+        'interest_rates': '100', 'loan_terms': '600', 'downpayments': '1e300,1000'})
+    assert response.status_code == 200
+    assert 'Infinity' not in response.get_data(as_text=True)
+    huge, normal = response.get_json()['scenarios']
+    assert huge['total_cost'] is None
+    assert normal['total_cost'] > 0
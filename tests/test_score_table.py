@@ -0,0 +1,124 @@
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from app import db, Car, CarScore, UserScoreStats, calculate_scores, load_user_cars, score_owners_lock, top_scores
+
+
+def materialized(user):
+    db.session.expire_all()
+    return tuple(
+        [(r['car'].id, r['perf_score'], r['interior_score'], r['total_cost'], r['value_score']) for r in results]
+        for results in (top_scores(user.id, CarScore.perf_score.desc()),
+                        top_scores(user.id, CarScore.value_score.desc()),
+                        top_scores(user.id, CarScore.total_cost))
+    )
+
+
+def recomputed(user):
+    return tuple(
+        [(r['car'].id, r['perf_score'], r['interior_score'], r['total_cost'], r['value_score']) for r in results]
+        for results in calculate_scores(load_user_cars(user.id))
+    )
+
+
+def test_inserts_are_scored(make_user, add_cars):
+    user = make_user()
+    add_cars(user, 12)
+    assert db.session.query(CarScore).count() == 12
+    assert materialized(user) == recomputed(user)
+
+
+def test_new_maximum_rescores_other_cars(make_user, add_cars):
+    user = make_user()
+    add_cars(user, 5)
+    car = Car.query.filter_by(user_id=user.id).first()
+    car.horsepower = 2000
+    db.session.commit()
+
+    assert db.session.get(UserScoreStats, user.id).max_hp == 2000
+    assert materialized(user) == recomputed(user)
+
+
+def test_interior_and_finance_updates(make_user, add_cars):
+    user = make_user()
+    add_cars(user, 6)
+    cars = Car.query.filter_by(user_id=user.id).order_by(Car.id).all()
+    cars[0].finance.loan_term = 84
+    cars[1].interior.leather_seats = not cars[1].interior.leather_seats
+    db.session.commit()
+
+    assert materialized(user) == recomputed(user)
+
+
+def test_deletes_drop_rows_and_maxima(make_user, add_cars):
+    user = make_user()
+    add_cars(user, 6)
+    strongest = Car.query.filter_by(user_id=user.id).order_by(Car.horsepower.desc()).first()
+    db.session.delete(strongest)
+    db.session.commit()
+
+    assert db.session.get(CarScore, strongest.id) is None
+    assert db.session.get(UserScoreStats, user.id).max_hp == 104
+    assert materialized(user) == recomputed(user)
+
+    db.session.delete(user)
+    db.session.commit()
+    assert db.session.query(CarScore).count() == 0
+    assert db.session.query(UserScoreStats).count() == 0
+
+
+def test_users_are_scored_independently(make_user, add_cars):
+    first, second = make_user('first'), make_user('second')
+    add_cars(first, 4)
+    add_cars(second, 3, start=20)
+
+    assert db.session.get(UserScoreStats, first.id).max_hp == 103
+    assert db.session.get(UserScoreStats, second.id).max_hp == 122
+    assert materialized(first) == recomputed(first)
+    assert materialized(second) == recomputed(second)
+
+
+def test_rebuild_scores_backfills(app, make_user, add_cars):
+    user = make_user()
+    add_cars(user, 8)
+    with db.engine.begin() as connection:
+        connection.execute(CarScore.__table__.delete())
+        connection.execute(UserScoreStats.__table__.delete())
+
+    result = app.test_cli_runner().invoke(args=['rebuild-scores'])
+
+    assert result.exit_code == 0
+    assert 'Rebuilt scores for 8 cars.' in result.output
+    assert materialized(user) == recomputed(user)
+
+
+def test_add_car_route_updates_results(client, make_user, login):
+    make_user()
+    login()
+    form = {
+        'company': 'Volvo', 'model': 'Main St', 'horsepower': '250', 'engine_displacement': '2.0',
+        'cylinders': '4', 'touchscreen_size': '9', 'premium_upholstery': 'on', 'car_price': '45000',
+        'down_payment': '9000', 'interest_rate': '5.9', 'loan_term': '60',
+    }
+    assert client.post('/add_car', data=form).status_code == 302
+
+    page = client.get('/results').get_data(as_text=True)
+    assert 'Volvo' in page
+    assert 'Total Cost: $' in page
+
+
+def test_score_writers_lock_their_owners(make_user, add_cars):
+    sql = str(score_owners_lock({3, 1}).compile(dialect=postgresql.dialect()))
+    assert sql.endswith('ORDER BY "user".id FOR NO KEY UPDATE')
+
+    user = make_user()
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        add_cars(user, 2)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    lock = next(i for i, s in enumerate(statements) if s.startswith('SELECT user.id'))
+    stats = next(i for i, s in enumerate(statements) if 'max(car_score.horsepower)' in s)
+    assert lock < stats
@@ -0,0 +1,139 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app import calculate_scores
+from scoring import round_values, total_costs
+
+
+def reference_scores(cars):
+    """The original per-car loop, kept verbatim as the parity oracle."""
+    max_hp = max(car.horsepower for car in cars) or 1
+    max_engine = max(car.engine_capacity for car in cars) or 1
+    max_cylinders = max(car.cylinders for car in cars) or 1
+
+    results = []
+    for car in cars:
+        perf_score = (
+            (car.horsepower / max_hp * 40) +
+            (car.engine_capacity / max_engine * 30) +
+            (car.cylinders / max_cylinders * 30)
+        )
+        interior_score = (
+            20 * int(car.interior.leather_seats) +
+            15 * int(car.interior.ventilated_seats) +
+            10 * int(car.interior.heated_steering) +
+            min(car.interior.infotainment_size * 2, 20)
+        )
+        monthly_interest = car.finance.interest_rate / 100 / 12
+        total_payments = car.finance.downpayment + sum(
+            (car.finance.downpayment * monthly_interest) *
+            (1 + monthly_interest) ** month
+            for month in range(car.finance.loan_term)
+        )
+        value_score = ((perf_score + interior_score) / (total_payments / 1000)) if total_payments else 0
+        results.append({
+            'car': car,
+            'perf_score': round(perf_score, 1),
+            'interior_score': round(interior_score, 1),
+            'total_cost': round(total_payments, 2),
+            'value_score': round(value_score, 2)
+        })
+
+    best_performance = sorted(results, key=lambda x: x['perf_score'], reverse=True)
+    best_value = sorted(results, key=lambda x: x['value_score'], reverse=True)
+    cheapest = sorted(results, key=lambda x: x['total_cost'])
+    return best_performance[:3], best_value[:3], cheapest[:3]
+
+
+def make_car(rng, **overrides):
+    fields = {
+        'horsepower': rng.randint(70, 800),
+        'engine_capacity': round(rng.uniform(1.0, 6.5), 1),
+        'cylinders': rng.choice([3, 4, 6, 8, 10, 12]),
+        'leather_seats': rng.random() < 0.5,
+        'ventilated_seats': rng.random() < 0.5,
+        'heated_steering': rng.random() < 0.5,
+        'infotainment_size': round(rng.uniform(0, 15), 1),
+        'downpayment': round(rng.uniform(0, 20000), 2),
+        'interest_rate': round(rng.uniform(0, 12), 2),
+        'loan_term': rng.choice([0, 12, 24, 36, 48, 60, 72, 84]),
+    }
+    fields.update(overrides)
+    return SimpleNamespace(
+        company=f"Car {rng.randint(0, 10 ** 6)}",
+        horsepower=fields['horsepower'],
+        engine_capacity=fields['engine_capacity'],
+        cylinders=fields['cylinders'],
+        interior=SimpleNamespace(
+            leather_seats=fields['leather_seats'],
+            ventilated_seats=fields['ventilated_seats'],
+            heated_steering=fields['heated_steering'],
+            infotainment_size=fields['infotainment_size'],
+        ),
+        finance=SimpleNamespace(
+            downpayment=fields['downpayment'],
+            interest_rate=fields['interest_rate'],
+            loan_term=fields['loan_term'],
+        ),
+    )
+
+
+def as_comparable(lists):
+    return [
+        [(id(r['car']), r['perf_score'], r['interior_score'], r['total_cost'], r['value_score']) for r in results]
+        for results in lists
+    ]
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 5, 50, 500])
+def test_matches_reference_implementation(count):
+    rng = random.Random(count)
+    cars = [make_car(rng) for _ in range(count)]
+    assert as_comparable(calculate_scores(cars)) == as_comparable(reference_scores(cars))
+
+
+def test_matches_reference_across_many_garages():
+    rng = random.Random(2024)
+    for _ in range(300):
+        cars = [make_car(rng) for _ in range(5)]
+        assert as_comparable(calculate_scores(cars)) == as_comparable(reference_scores(cars))
+
+
+def test_rounding_follows_python_round():
+    # 71/800*40 + 1.3/6.5*30 + 3/12*30 is 17.05000000000000071..., which
+    # round() takes to 17.1 and np.round to 17.0.
+    rng = random.Random(5)
+    cars = [make_car(rng, horsepower=800, engine_capacity=6.5, cylinders=12),
+            make_car(rng, horsepower=71, engine_capacity=1.3, cylinders=3)]
+    assert [r['perf_score'] for r in calculate_scores(cars)[0]] == [100.0, 17.1]
+    assert as_comparable(calculate_scores(cars)) == as_comparable(reference_scores(cars))
+    assert round_values([45.45, 2.675, 0.125, 17.05], 1).tolist() == [45.5, 2.7, 0.1, 17.1]
+    assert round_values([45.45, 2.675, 0.125, -1.005], 2).tolist() == [45.45, 2.67, 0.12, -1.0]
+
+
+def test_ties_keep_insertion_order():
+    rng = random.Random(7)
+    cars = [make_car(rng, horsepower=300, engine_capacity=3.0, cylinders=6,
+                     downpayment=5000.0, interest_rate=5.0, loan_term=36) for _ in range(6)]
+    assert as_comparable(calculate_scores(cars)) == as_comparable(reference_scores(cars))
+
+
+def test_zero_values_match_reference():
+    rng = random.Random(11)
+    cars = [make_car(rng, horsepower=0, engine_capacity=0.0, cylinders=0, downpayment=0.0) for _ in range(4)]
+    assert as_comparable(calculate_scores(cars)) == as_comparable(reference_scores(cars))
+
+
+def test_empty_and_invalid_input():
+    assert calculate_scores([]) == ([], [], [])
+    rng = random.Random(3)
+    assert calculate_scores([make_car(rng, infotainment_size=None)]) == ([], [], [])
+
+
+def test_closed_form_total_cost_matches_month_loop():
+    downpayment, rate, term = 12000.0, 6.9, 84
+    monthly_interest = rate / 100 / 12
+    looped = downpayment + sum(downpayment * monthly_interest * (1 + monthly_interest) ** m for m in range(term))
+    assert total_costs(downpayment, rate, term) == pytest.approx(looped, rel=1e-12)
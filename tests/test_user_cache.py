@@ -0,0 +1,98 @@
+import re
+
+import pytest
+
+from app import db, Car, User, user_cache
+from test_queries import count_statements
+from user_cache import LocalCache, MemoryStore, SharedCache, make_user_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_local_cache_expires_and_evicts():
+    clock = FakeClock()
+    cache = LocalCache(max_size=2, ttl=10, clock=clock)
+    cache.set(1, 'a')
+    cache.set(2, 'b')
+    assert cache.get(1) == 'a'
+    cache.set(3, 'c')  # 2 is now the least recently used entry
+
+    assert cache.get(2) is None
+    assert cache.get(3) == 'c'
+    clock.now = 10
+    assert cache.get(1) is None
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'evictions': 1, 'size': 1}
+
+
+def test_shared_cache_round_trips_json():
+    clock = FakeClock()
+    cache = SharedCache(MemoryStore(clock=clock), ttl=5)
+    cache.set(7, {'id': 7, 'username': 'driver'})
+
+    assert cache.get(7) == {'id': 7, 'username': 'driver'}
+    cache.delete(7)
+    assert cache.get(7) is None
+    cache.set(7, {'id': 7})
+    clock.now = 5
+    assert cache.get(7) is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        make_user_cache('memcached')
+
+
+def user_queries(statements):
+    return [s for s in statements if re.search(r'FROM "?user"?\s', s)]
+
+
+def test_current_user_is_served_from_cache(client, make_user, login):
+    make_user()
+    login()
+    client.get('/dashboard')
+
+    db.session.expunge_all()
+    with count_statements() as statements:
+        assert client.get('/dashboard').status_code == 200
+    assert user_queries(statements) == []
+    assert user_cache.stats()['hits'] >= 1
+
+
+def test_logout_and_delete_invalidate(client, make_user, login):
+    user = make_user()
+    login()
+    client.get('/dashboard')
+    assert user_cache.get(user.id) is not None
+
+    client.get('/logout')
+    assert user_cache.get(user.id) is None
+
+    login()
+    client.get('/dashboard')
+    db.session.delete(db.session.get(User, user.id))
+    db.session.commit()
+    assert user_cache.get(user.id) is None
+    assert client.get('/dashboard').status_code == 302
+
+
+def test_writes_do_not_trust_a_stale_cache_entry(client, make_user, login):
+    user_id = make_user().id
+    login()
+    client.get('/dashboard')
+    # Deleted by another worker: this worker's cache never heard about it.
+    db.session.execute(User.__table__.delete().where(User.__table__.c.id == user_id))
+    db.session.commit()
+    assert user_cache.get(user_id) is not None
+
+    response = client.post('/add_car', data={'company': 'Ghost', 'model': 'X', 'horsepower': '100',
+                                             'engine_displacement': '2.0', 'cylinders': '4', 'car_price': '1',
+                                             'interest_rate': '1', 'loan_term': '12'})
+    assert response.status_code == 302 and '/login' in response.headers['Location']
+    assert Car.query.count() == 0
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# --------------------
+# User Cache Backends
+# --------------------
+# The login manager's user loader runs on every authenticated request. These
+# caches keep a small, JSON-serializable snapshot of each user so that most
+# requests can skip the users table entirely.
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self)}
+
+
+class LocalCache(CacheStats):
+    """Bounded LRU cache with a per-entry TTL, private to one worker process."""
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache(CacheStats):
+    """Cache kept in a store shared by all workers, e.g. Redis.
+
+    ``client`` needs Redis-style ``get``, ``set(key, value, ex=seconds)`` and
+    ``delete`` methods; the store enforces the TTL and the memory bound.
+    Hits and misses are counted per process.
+    """
+
+    def __init__(self, client, ttl=300, prefix='car-app:user:'):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def __len__(self):
+        return 0
+
+    def get(self, key):
+        raw = self.client.get(f"{self.prefix}{key}")
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(f"{self.prefix}{key}", json.dumps(value), ex=self.ttl)
+
+    def delete(self, key):
+        self.client.delete(f"{self.prefix}{key}")
+
+    def clear(self):
+        pass
+
+
+class MemoryStore:
+    """Local stand-in for a Redis client, for tests and single-process runs."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= self.clock()):
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (self.clock() + ex if ex else None, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class NullCache(CacheStats):
+    """Disables caching; every lookup is a miss."""
+
+    def __len__(self):
+        return 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+def make_user_cache(backend='local', max_size=1024, ttl=300, url=None):
+    """Build the cache selected by the USER_CACHE_* settings."""
+    if backend == 'local':
+        return LocalCache(max_size=max_size, ttl=ttl)
+    if backend == 'memory':
+        return SharedCache(MemoryStore(), ttl=ttl)
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("USER_CACHE_BACKEND=redis requires the 'redis' package")
+        return SharedCache(redis.Redis.from_url(url), ttl=ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f"Unknown user cache backend: {backend!r}")